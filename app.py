@@ -88,7 +88,7 @@ try:
                     st.error("Specified pages don't exist. Check the format.", icon="⚠️")
                 else:
                     if images:
-                        for data, name in images.items():
+                        for (name, *_), data in images.items():
                             st.image(data, caption=name)
                     else:
                         st.info("No images found")
@@ -98,10 +98,13 @@ try:
                 container=st,
                 key="extract_table_pages",
             ):
-                helpers.extract_tables(
-                    session_state["file"],
-                    page_numbers_str,
-                )
+                try:
+                    helpers.extract_tables(
+                        session_state["file"],
+                        page_numbers_str,
+                    )
+                except (IndexError, ValueError):
+                    st.error("Specified pages don't exist. Check the format.", icon="⚠️")
 
         with rcol.expander("🔄️ Convert to Word"):
             st.caption("Takes ~1 second/page. Will remove password if present")
@@ -371,7 +374,11 @@ try:
                     )
 
                 original_size = sys.getsizeof(pdf)
-                reduced_size = sys.getsizeof(pdf_small)
+                reduced_size = (
+                    pdf_small.getbuffer().nbytes
+                    if isinstance(pdf_small, BytesIO)
+                    else sys.getsizeof(pdf_small)
+                )
                 st.caption(
                     f"Reduction: {100 - (reduced_size / original_size) * 100:.2f}%"
                 )
@@ -387,11 +394,15 @@ try:
             with rcol:
                 st.caption(f"Reduced size: {reduced_size / 1024:.2f} KB")
                 helpers.preview_pdf(
-                    PdfReader(BytesIO(pdf_small)),
-                    pdf_small,
-                    key="other",
+                    PdfReader(
+                        pdf_small if isinstance(pdf_small, BytesIO) else BytesIO(pdf_small)
+                    ),
+                    pdf_small.getvalue() if isinstance(pdf_small, BytesIO) else pdf_small,
+                    key="reduced",
                     password=session_state.password,
                 )
+            if isinstance(pdf_small, BytesIO):
+                pdf_small.seek(0)
             st.download_button(
                 "📥 Download smaller PDF",
                 data=pdf_small,
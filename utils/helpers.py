@@ -1,9 +1,11 @@
 import contextlib
+import hashlib
+import os
 import re
-from datetime import datetime
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from io import BytesIO
 from pathlib import Path
-from random import random
 from typing import Callable, Dict, Literal, Optional, Tuple, Union
 
 import pandas as pd
@@ -13,13 +15,17 @@ import streamlit as st
 from pdf2docx import Converter
 from PIL import Image
 from pypdf import PdfReader, PdfWriter, Transformation
-from pypdf.errors import PdfReadError, PdfStreamError
+from pypdf.errors import PdfStreamError
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
 from streamlit import session_state
 from streamlit.runtime.uploaded_file_manager import UploadedFile
 from streamlit_pdf_viewer import pdf_viewer
 
+_PDF_DT_RE = re.compile(r"^D:\d{14}\+\d{2}\'\d{2}\'$")
+
+_TABLE_STRATEGIES = ("lines", "lines_strict", "text")
+
 
 def select_pages(container, key: str):
     return container.text_input(
@@ -37,37 +43,92 @@ def select_pages(container, key: str):
     ).lower()
 
 
-@st.cache_data
-def image_to_pdf(stamp_img: Union[Path, str]) -> PdfReader:
-    img = Image.open(stamp_img)
+def _jpeg_to_pdf_bytes(jpeg: bytes, width: int, height: int, color_space: str) -> bytes:
+    """Wrap raw JPEG data in a minimal one-page PDF without re-encoding."""
+    content = f"q {width} 0 0 {height} 0 0 cm /Im0 Do Q".encode("ascii")
+    objects = [
+        b"<</Type/Catalog/Pages 2 0 R>>",
+        b"<</Type/Pages/Kids[3 0 R]/Count 1>>",
+        f"<</Type/Page/Parent 2 0 R/MediaBox[0 0 {width} {height}]"
+        f"/Resources<</XObject<</Im0 4 0 R>>>>/Contents 5 0 R>>".encode("ascii"),
+        f"<</Type/XObject/Subtype/Image/Width {width}/Height {height}"
+        f"/ColorSpace/{color_space}/BitsPerComponent 8/Filter/DCTDecode"
+        f"/Length {len(jpeg)}>>\nstream\n".encode("ascii") + jpeg + b"\nendstream",
+        f"<</Length {len(content)}>>\nstream\n".encode("ascii")
+        + content
+        + b"\nendstream",
+    ]
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode("ascii") + body + b"\nendobj\n"
+
+    xref_pos = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("ascii")
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode("ascii")
+    out += (
+        f"trailer\n<</Size {len(objects) + 1}/Root 1 0 R>>\n"
+        f"startxref\n{xref_pos}\n%%EOF\n".encode("ascii")
+    )
+    return bytes(out)
+
+
+@st.cache_data(
+    hash_funcs={
+        UploadedFile: lambda f: hashlib.blake2b(f.getvalue(), digest_size=16).digest()
+    }
+)
+def _image_to_pdf_bytes(stamp_img: Union[Path, str, UploadedFile]) -> bytes:
+    if hasattr(stamp_img, "getvalue"):
+        data = stamp_img.getvalue()
+    else:
+        data = Path(stamp_img).read_bytes()
+
+    # Image.open only reads the header here, no pixel decode
+    img = Image.open(BytesIO(data))
+
+    # JPEG data can go into the PDF as-is (DCTDecode), skipping Pillow's
+    # PDF writer entirely
+    color_space = {"RGB": "DeviceRGB", "L": "DeviceGray"}.get(img.mode)
+    if img.format == "JPEG" and color_space:
+        return _jpeg_to_pdf_bytes(data, img.width, img.height, color_space)
+
     img_as_pdf = BytesIO()
     img.save(img_as_pdf, "pdf")
-    return PdfReader(img_as_pdf)
+    return img_as_pdf.getvalue()
+
+
+def image_to_pdf(stamp_img: Union[Path, str, UploadedFile]) -> PdfReader:
+    # PdfReader instances do not survive st.cache_data's pickle
+    # round-trip, so cache the PDF bytes and build the reader here
+    return PdfReader(BytesIO(_image_to_pdf_bytes(stamp_img)))
 
 
-@st.cache_data
 def watermark_img(
     reader: PdfReader,
     stamp_img: UploadedFile,
-) -> None:
+) -> bytes:
     # Convert the image to a PDF
     stamp_pdf = image_to_pdf(stamp_img)
 
-    # Then use the same stamp code from above
     stamp_page = stamp_pdf.pages[0]
 
     writer = PdfWriter()
 
-    writer.append(reader)
-
-    for content_page in writer.pages:
-        content_page.merge_transformed_page(
+    # Stamp each page in place and hand it to the writer, instead of
+    # deep-cloning the whole document with writer.append first
+    for page in reader.pages:
+        page.merge_transformed_page(
             stamp_page, Transformation(), expand=True, over=False
         )
+        writer.add_page(page)
 
-    # TODO: Write to byte_stream
-    with open("watermarked.pdf", "wb") as fp:
+    with BytesIO() as fp:
         writer.write(fp)
+        return fp.getvalue()
 
 
 def get_option(key: Literal["main", "merge"]) -> str:
@@ -107,10 +168,9 @@ def upload_pdf(
         session_state["file"] = file
         session_state["name"] = file.name
         pdf = file.getvalue()
-        try:
-            reader = PdfReader(BytesIO(pdf), password=password)
-        except PdfReadError:
-            reader = PdfReader(BytesIO(pdf))
+        reader = PdfReader(BytesIO(pdf))
+        if reader.is_encrypted and password:
+            reader.decrypt(password)
         return pdf, reader
     return None, None
 
@@ -125,18 +185,22 @@ def load_pdf_from_url(
     )
 
     @st.cache_data
-    def _cached_get_url(url: str) -> requests.Response:
-        return requests.get(url)
+    def _download_pdf(url: str) -> bytes:
+        # Stream chunks into a BytesIO as they arrive instead of letting
+        # requests materialize response.content in one go
+        with requests.get(url, stream=True) as response:
+            buffer = BytesIO()
+            for chunk in response.iter_content(chunk_size=65536):
+                buffer.write(chunk)
+            return buffer.getvalue()
 
     if url != "":
         try:
-            response = _cached_get_url(url)
-            session_state["file"] = pdf = response.content
+            session_state["file"] = pdf = _download_pdf(url)
             session_state["name"] = url.split("/")[-1]
-            try:
-                reader = PdfReader(BytesIO(pdf), password=password)
-            except PdfReadError:
-                reader = PdfReader(BytesIO(pdf))
+            reader = PdfReader(BytesIO(pdf))
+            if reader.is_encrypted and password:
+                reader.decrypt(password)
             return pdf, reader
         except PdfStreamError:
             st.error("The URL does not seem to be a valid PDF file.", icon="❌")
@@ -181,7 +245,8 @@ def handle_encrypted_pdf(reader: PdfReader, password: str, key: str) -> None:
         pdf_viewer(
             f"unprotected_{session_state['name']}",
             height=600 if key == "main" else 250,
-            key=str(random()),
+            # Stable key so Streamlit reuses the component across reruns
+            key=f"viewer_{key}_{session_state['decrypted_filename']}",
         )
     else:
         st.error("Password required", icon="🔒")
@@ -191,7 +256,9 @@ def handle_unencrypted_pdf(pdf: bytes, key: str) -> None:
     pdf_viewer(
         pdf,
         height=600 if key == "main" else 250,
-        key=str(random()),
+        # Key on the content hash so the component is only re-rendered
+        # when the PDF actually changes
+        key=f"viewer_{key}_{hashlib.blake2b(pdf, digest_size=8).hexdigest()}",
     )
 
 
@@ -213,7 +280,7 @@ def display_metadata(reader: PdfReader) -> None:
 def preview_pdf(
     reader: PdfReader,
     pdf: bytes = None,
-    key: Literal["main", "other"] = "main",
+    key: Literal["main", "other", "reduced"] = "main",
     password: str = "",
 ) -> None:
     with contextlib.suppress(NameError):
@@ -233,84 +300,74 @@ def preview_pdf(
             handle_unencrypted_pdf(pdf, key)
 
 
-@st.cache_data
 def is_pdf_datetime(s: str) -> bool:
-    pattern = r"^D:\d{14}\+\d{2}\'\d{2}\'$"
-    return bool(re.match(pattern, s))
-
-
-@st.cache_data
-def convert_pdf_datetime(pdf_datetime: str) -> str:
-    # Remove the 'D:' at the beginning
-    pdf_datetime = pdf_datetime[2:]
+    return _PDF_DT_RE.match(s) is not None
 
-    # Extract the date, time, and timezone components
-    date_str = pdf_datetime[:8]
-    time_str = pdf_datetime[8:14]
-    tz_str = pdf_datetime[14:]
 
+def convert_pdf_datetime(s: str) -> str:
+    # Input format is fixed (D:YYYYMMDDHHMMSS+hh'mm'), so slice the
+    # components directly instead of round-tripping through strptime
     return (
-        datetime.strptime(date_str + time_str, "%Y%m%d%H%M%S").strftime(
-            "%Y-%m-%d %H:%M:%S "
-        )
-        + tz_str
+        f"{s[2:6]}-{s[6:8]}-{s[8:10]} {s[10:12]}:{s[12:14]}:{s[14:16]} {s[16:]}"
     )
 
 
-@st.cache_data
 def parse_page_numbers(page_numbers_str):
-    # Split the input string by comma or hyphen
-    parts = page_numbers_str.split(",")
-
-    # Initialize an empty list to store parsed page numbers
+    # Single pass: convert 1-based pages/ranges to 0-based indices as we go
     parsed_page_numbers = []
 
-    # Iterate over each part
-    for part in parts:
-        # Remove any leading/trailing spaces
-        part = part.strip()
-
-        # If the part contains a hyphen, it represents a range
-        if "-" in part:
-            start, end = map(int, part.split("-"))
-            parsed_page_numbers.extend(range(start, end + 1))
+    for part in page_numbers_str.split(","):
+        start, sep, end = part.strip().partition("-")
+        if sep:
+            parsed_page_numbers.extend(range(int(start) - 1, int(end)))
         else:
-            # Otherwise, it's a single page number
-            parsed_page_numbers.append(int(part))
+            parsed_page_numbers.append(int(start) - 1)
 
-    return [i - 1 for i in parsed_page_numbers]
+    return parsed_page_numbers
+
+
+def _resolve_pages(reader: PdfReader, page_numbers_str: str):
+    """Resolve a user page selection to an iterable of 0-based page indices.
+
+    An empty selection or "all" means every page, without going through
+    parse_page_numbers.
+    """
+    if not page_numbers_str or page_numbers_str == "all":
+        return range(len(reader.pages))
+    return parse_page_numbers(page_numbers_str)
 
 
 def extract_text(
-    reader: PdfReader.pages,
+    reader: PdfReader,
     page_numbers_str: str = "all",
     mode: Literal["plain", "layout"] = "plain",
 ) -> str:
-    text = ""
+    parts = [""]
 
-    if page_numbers_str == "all":
-        for page in reader.pages:
-            text = text + " " + page.extract_text(extraction_mode=mode)
-    else:
-        pages = parse_page_numbers(page_numbers_str)
-        for page in pages:
-            text = text + " " + reader.pages[page].extract_text()
+    for index in _resolve_pages(reader, page_numbers_str):
+        parts.append(reader.pages[index].extract_text(extraction_mode=mode))
 
-    return text
+    return " ".join(parts)
 
 
-def extract_images(reader: PdfReader.pages, page_numbers_str: str = "all") -> str:
+def extract_images(
+    reader: PdfReader, page_numbers_str: str = "all"
+) -> Dict[Tuple[str, int, int], bytes]:
+    # Image names are only unique within a page, so key by name plus a
+    # cheap fingerprint of the data: keying by image.data alone would
+    # hash the full raw image bytes on every insert. The head of an
+    # image stream is mostly format headers, so fingerprint the tail too.
     images = {}
-    if page_numbers_str == "all":
-        for page in reader.pages:
-            images |= {image.data: image.name for image in page.images}
 
-    else:
-        pages = parse_page_numbers(page_numbers_str)
-        for page in pages:
-            images.update(
-                {image.data: image.name for image in reader.pages[page].images}
-            )
+    for index in _resolve_pages(reader, page_numbers_str):
+        images |= {
+            (
+                image.name,
+                len(image.data),
+                hash(image.data[:64] + image.data[-64:]),
+            ): image.data
+            for image in reader.pages[index].images
+        }
 
     return images
 
@@ -322,12 +379,12 @@ def extract_tables(file, page_numbers_str):
     col0, col1 = st.columns(2)
     vertical_strategy = col0.selectbox(
         "Vertical strategy",
-        ["lines", "lines_strict", "text"],
+        _TABLE_STRATEGIES,
         index=2,
     )
     horizontal_strategy = col1.selectbox(
         "Horizontal strategy",
-        ["lines", "lines_strict", "text"],
+        _TABLE_STRATEGIES,
         index=2,
     )
 
@@ -335,57 +392,44 @@ def extract_tables(file, page_numbers_str):
 
     first_row_index = 1 if header else 0
 
+    settings = {
+        "vertical_strategy": vertical_strategy,
+        "horizontal_strategy": horizontal_strategy,
+    }
+
     with pdfplumber.open(
         BytesIO(file) if isinstance(file, bytes) else file,
         password=session_state["password"],
     ) as table_pdf:
         if page_numbers_str == "all":
-            for page in table_pdf.pages:
-                for table in page.extract_tables(
-                    {
-                        "vertical_strategy": vertical_strategy,
-                        "horizontal_strategy": horizontal_strategy,
-                    }
-                ):
-                    st.write(
-                        pd.DataFrame(
-                            table[first_row_index:],
-                            columns=table[0] if header else None,
-                        )
-                    )
+            pages = table_pdf.pages
         else:
-            pages = parse_page_numbers(page_numbers_str)
-            for page in pages:
-                for page in table_pdf.pages[page : page + 1]:
-                    for table in page.extract_tables(
-                        {
-                            "vertical_strategy": vertical_strategy,
-                            "horizontal_strategy": horizontal_strategy,
-                        }
-                    ):
-                        st.write(
-                            pd.DataFrame(
-                                table[first_row_index:],
-                                columns=table[0] if header else None,
-                            )
-                        )
+            pages = [table_pdf.pages[i] for i in parse_page_numbers(page_numbers_str)]
+
+        for page in pages:
+            for table in page.extract_tables(settings):
+                st.write(
+                    pd.DataFrame(
+                        table[first_row_index:],
+                        columns=table[0] if header else None,
+                    )
+                )
 
 
 def decrypt_pdf(reader: PdfReader, password: str, filename: str) -> None:
     reader.decrypt(password)
 
-    writer = PdfWriter()
-
-    for page in reader.pages:
-        writer.add_page(page)
+    writer = PdfWriter(clone_from=reader)
 
     with open(filename, "wb") as f:
         writer.write(f)
 
 
 @st.cache_data
-def remove_images(pdf: bytes, remove_images: bool, password: str) -> bytes:
-    reader = PdfReader(BytesIO(pdf))
+def remove_images(
+    pdf: Union[bytes, BytesIO], remove_images: bool, password: str
+) -> BytesIO:
+    reader = PdfReader(BytesIO(pdf) if isinstance(pdf, bytes) else pdf)
 
     if reader.is_encrypted:
         reader.decrypt(password)
@@ -405,11 +449,13 @@ def remove_images(pdf: bytes, remove_images: bool, password: str) -> bytes:
 
     bytes_stream.seek(0)
 
-    return bytes_stream.getvalue()
+    return bytes_stream
 
 
-def reduce_image_quality(pdf: bytes, quality: int, password: str) -> bytes:
-    reader = PdfReader(BytesIO(pdf))
+def reduce_image_quality(
+    pdf: Union[bytes, BytesIO], quality: int, password: str
+) -> BytesIO:
+    reader = PdfReader(BytesIO(pdf) if isinstance(pdf, bytes) else pdf)
 
     if reader.is_encrypted:
         reader.decrypt(password)
@@ -421,46 +467,85 @@ def reduce_image_quality(pdf: bytes, quality: int, password: str) -> bytes:
 
     writer.add_metadata(reader.metadata)
 
-    for page in writer.pages:
-        for img in page.images:
-            img.replace(img.image, quality=quality)
+    # Pillow's JPEG re-encode releases the GIL, so re-encode all images
+    # in parallel instead of page by page
+    images = [img for page in writer.pages for img in page.images]
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        list(executor.map(lambda img: img.replace(img.image, quality=quality), images))
 
     bytes_stream = BytesIO()
     writer.write(bytes_stream)
 
     bytes_stream.seek(0)
 
-    return bytes_stream.getvalue()
+    return bytes_stream
 
 
 @st.cache_data
-def compress_pdf(pdf: bytes, password: str) -> bytes:
-    reader = PdfReader(BytesIO(pdf))
+def compress_pdf(pdf: Union[bytes, BytesIO], password: str) -> BytesIO:
+    reader = PdfReader(BytesIO(pdf) if isinstance(pdf, bytes) else pdf)
 
     if reader.is_encrypted:
         reader.decrypt(password)
 
     writer = PdfWriter(clone_from=reader)
 
-    for page in writer.pages:
-        page.compress_content_streams()  # This is CPU intensive!
+    # compress_content_streams is CPU intensive (zlib), but zlib releases
+    # the GIL and each page owns its content stream, so fan out to threads
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        list(executor.map(lambda page: page.compress_content_streams(), writer.pages))
 
     bytes_stream = BytesIO()
     writer.write(bytes_stream)
     bytes_stream.seek(0)
 
-    return bytes_stream.getvalue()
+    return bytes_stream
 
 
-@st.cache_data
-def convert_pdf_to_word(pdf):
-    cv = Converter(stream=pdf, password=session_state.password)
+_PDF2DOCX_CACHE_DIR = Path(".pdf2docx_cache")
+
+_convert_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _get_convert_executor() -> ProcessPoolExecutor:
+    # Created lazily so the worker process only exists once a conversion
+    # has actually been requested
+    global _convert_executor
+    if _convert_executor is None:
+        _convert_executor = ProcessPoolExecutor(max_workers=1)
+    return _convert_executor
+
+
+def _convert_pdf_to_word_task(pdf: bytes, password: Optional[str]) -> bytes:
+    cv = Converter(stream=pdf, password=password)
     docx_stream = BytesIO()
     cv.convert(docx_stream, start=0, end=None)
     cv.close()
+    return docx_stream.getvalue()
+
+
+@st.cache_data
+def convert_pdf_to_word(pdf):
+    # pdf2docx takes seconds per page, so back the in-memory Streamlit
+    # cache with an on-disk one keyed by content hash that survives
+    # app restarts
+    _PDF2DOCX_CACHE_DIR.mkdir(exist_ok=True)
+    cached = _PDF2DOCX_CACHE_DIR / f"{hashlib.blake2b(pdf).hexdigest()}.docx"
+    if cached.exists():
+        return BytesIO(cached.read_bytes())
+
+    # Run the conversion in a worker process so the Streamlit thread
+    # stays responsive, polling the future until it completes
+    future = _get_convert_executor().submit(
+        _convert_pdf_to_word_task, pdf, session_state.password
+    )
+    with st.spinner("Converting PDF to Word..."):
+        while not future.done():
+            time.sleep(0.25)
+    docx_bytes = future.result()
 
-    docx_stream.seek(0)
-    return docx_stream
+    cached.write_bytes(docx_bytes)
+    return BytesIO(docx_bytes)
 
 
 def hex_to_rgba(hex_color: str) -> Tuple[float, float, float]:
@@ -473,8 +558,8 @@ def hex_to_rgba(hex_color: str) -> Tuple[float, float, float]:
     Returns:
         Tuple[float, float, float]: The RGB color tuple
     """
-    hex_color = hex_color.lstrip("#")
-    return tuple(int(hex_color[i : i + 2], 16) / 255 for i in (0, 2, 4))
+    value = int(hex_color.lstrip("#"), 16)
+    return ((value >> 16) & 0xFF) / 255, ((value >> 8) & 0xFF) / 255, (value & 0xFF) / 255
 
 
 def draw_watermark_grid(
@@ -494,13 +579,21 @@ def draw_watermark_grid(
     Returns:
         None
     """
-    for x in range(-100, int(width) + 100, step_x):
-        for y in range(-100, int(height) + 100, step_y):
-            can.saveState()
-            can.translate(x, y)
-            can.rotate(45)
-            can.drawCentredString(0, 0, stamp_label)
-            can.restoreState()
+    positions = [
+        (x, y)
+        for x in range(-100, int(width) + 100, step_x)
+        for y in range(-100, int(height) + 100, step_y)
+    ]
+
+    # Rotate the canvas once and draw each stamp at the inverse-rotated
+    # grid position, instead of a saveState/translate/rotate/restoreState
+    # round-trip per cell
+    c = s = 0.7071067811865476  # cos(45°) == sin(45°)
+    can.saveState()
+    can.rotate(45)
+    for x, y in positions:
+        can.drawCentredString(c * x + s * y, c * y - s * x, stamp_label)
+    can.restoreState()
 
 
 def merge_watermark_into_pdf(pdf: bytes, watermark: BytesIO) -> bytes: